@@ -4,6 +4,7 @@ QKA交易客户端模块
 提供QMT交易服务器的客户端接口，支持远程调用交易功能。
 """
 
+import httpx
 import requests
 from typing import Any, Dict, Optional
 from qka.utils.logger import logger
@@ -17,6 +18,7 @@ class QMTClient:
     Attributes:
         base_url (str): API服务器地址
         session (requests.Session): HTTP会话对象
+        async_session (httpx.AsyncClient): 异步HTTP会话对象，首次调用api_async时创建
         token (str): 访问令牌
         headers (Dict): HTTP请求头
     """
@@ -38,6 +40,7 @@ class QMTClient:
             raise ValueError("必须提供访问令牌(token)")
         self.token = token
         self.headers = {"X-Token": self.token}
+        self.async_session: Optional[httpx.AsyncClient] = None
 
     def api(self, method_name: str, **params) -> Any:
         """
@@ -60,14 +63,81 @@ class QMTClient:
                 headers=self.headers,
                 timeout=30
             )
-            response.raise_for_status()
-            result = response.json()
+            return self.parse_response(response)
+        except Exception as e:
+            logger.error(f"调用 {method_name} 失败: {str(e)}")
+            raise
+
+    async def api_async(self, method_name: str, **params) -> Any:
+        """
+        通用调用接口方法的异步版本，不阻塞事件循环
+        
+        Args:
+            method_name (str): 要调用的接口名称
+            **params: 接口参数，作为关键字参数传入
             
-            if not result.get('success'):
-                raise Exception(f"API调用失败: {result.get('detail')}")
+        Returns:
+            Any: 接口返回的数据
             
-            return result.get('data')
+        Raises:
+            Exception: API调用失败时抛出异常
+        """
+        try:
+            response = await self.post_async(method_name, **params)
+            return self.parse_response(response)
         except Exception as e:
             logger.error(f"调用 {method_name} 失败: {str(e)}")
             raise
 
+    async def post_async(self, method_name: str, **params) -> httpx.Response:
+        """
+        异步调用接口并返回原始响应，不检查状态码也不记录日志
+
+        供需要自行处理特定状态码（如接口不存在时的404）的调用方使用，
+        响应可再交给 parse_response 解析。
+
+        Args:
+            method_name (str): 要调用的接口名称
+            **params: 接口参数，作为关键字参数传入
+
+        Returns:
+            httpx.Response: 服务器的原始响应
+        """
+        if self.async_session is None:
+            self.async_session = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=30
+            )
+        return await self.async_session.post(
+            f"/api/{method_name}",
+            json=params or {}
+        )
+
+    @staticmethod
+    def parse_response(response) -> Any:
+        """
+        检查响应状态并取出接口返回的数据
+
+        Args:
+            response: requests 或 httpx 的响应对象
+
+        Returns:
+            Any: 接口返回的数据
+
+        Raises:
+            Exception: HTTP状态码错误或接口返回失败时抛出
+        """
+        response.raise_for_status()
+        result = response.json()
+        
+        if not result.get('success'):
+            raise Exception(f"API调用失败: {result.get('detail')}")
+        
+        return result.get('data')
+
+    async def aclose(self):
+        """关闭异步HTTP会话"""
+        if self.async_session is not None:
+            await self.async_session.aclose()
+            self.async_session = None
@@ -7,11 +7,18 @@ QKA交易服务器模块
 from fastapi import FastAPI, HTTPException, Header, Depends
 from pydantic import BaseModel
 import inspect
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, List, Optional
 from qka.brokers.trade import create_trader
 import uvicorn
 import secrets
 
+
+class OrdersBatchRequest(BaseModel):
+    """批量下单请求，orders 中每一项为 order_stock 的参数（不含 account）"""
+    orders: List[Dict[str, Any]]
+
+
 class QMTServer:
     """
     QMT交易服务器类
@@ -47,6 +54,8 @@ class QMTServer:
         self.app = FastAPI()
         self.trader = None
         self.account = None
+        # xtquant 交易对象不保证线程安全，所有对 trader 的调用都在此锁内串行执行
+        self._trader_lock = threading.Lock()
         self.token = token if token else self.generate_token()  # 使用自定义token或生成固定token
         print(f"\n授权Token: {self.token}\n")  # 打印token供客户端使用
 
@@ -139,7 +148,8 @@ class QMTServer:
                 params = request.dict(exclude_unset=True)
                 if 'account' in param_names:
                     params['account'] = self.account
-                result = getattr(self.trader, method_name)(**params)
+                with self._trader_lock:
+                    result = getattr(self.trader, method_name)(**params)
                 converted_result = self.convert_to_dict(result)
                 return {'success': True, 'data': converted_result}
             except Exception as e:
@@ -147,6 +157,23 @@ class QMTServer:
 
         self.app.post(f'/api/{method_name}')(endpoint)
 
+    def setup_batch_routes(self):
+        """设置批量下单路由，逐个调用 order_stock 并按顺序返回每笔订单的结果"""
+        # 普通函数由 FastAPI 放到线程池执行，避免逐单阻塞的 order_stock 卡住事件循环；
+        # 并发到达的多个批次会落在不同的工作线程上，因此整批持有 trader 锁串行下单
+        def orders_batch(request: OrdersBatchRequest, token: str = Depends(self.verify_token)):
+            results = []
+            with self._trader_lock:
+                for order in request.orders:
+                    try:
+                        result = self.trader.order_stock(self.account, **order)
+                        results.append({'success': True, 'data': self.convert_to_dict(result)})
+                    except Exception as e:
+                        results.append({'success': False, 'detail': str(e)})
+            return {'success': True, 'data': results}
+
+        self.app.post('/api/orders_batch')(orders_batch)
+
     def setup_routes(self):
         """设置所有路由"""
         trader_methods = inspect.getmembers(
@@ -161,6 +188,8 @@ class QMTServer:
             if not method_name.startswith('_') and method_name not in excluded_methods:
                 self.convert_method_to_endpoint(method_name, method)
 
+        self.setup_batch_routes()
+
     def start(self):
         """启动服务器"""
         self.init_trader()
@@ -15,16 +15,19 @@ QKA信号桥接服务模块
 
 import time
 import uuid
+import asyncio
 import secrets
 import threading
-from collections import OrderedDict
-from typing import Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 from fastapi import FastAPI, HTTPException, Header, Depends
 from pydantic import BaseModel, field_validator
 import uvicorn
 
 from qka.brokers.client import QMTClient
+from qka.utils.util import add_stock_suffix
 from qka.utils.logger import logger
 
 # xtconstant 常量硬编码，避免依赖 xtquant
@@ -33,6 +36,13 @@ SIDE_MAP = {
     "sell": 24,  # xtconstant.STOCK_SELL
 }
 
+# 常见写法直接查表得到规范化的 side，其余大小写组合再走 lower()
+_SIDE_ALIASES = {
+    alias: side
+    for side in SIDE_MAP
+    for alias in (side, side.upper(), side.capitalize())
+}
+
 
 # ---------------------------------------------------------------------------
 # Pydantic 模型
@@ -50,6 +60,9 @@ class SignalRequest(BaseModel):
     @field_validator("side")
     @classmethod
     def validate_side(cls, v: str) -> str:
+        side = _SIDE_ALIASES.get(v)
+        if side is not None:
+            return side
         v = v.lower()
         if v not in SIDE_MAP:
             raise ValueError(f"side 必须为 'buy' 或 'sell'，收到: {v}")
@@ -58,10 +71,8 @@ class SignalRequest(BaseModel):
     @field_validator("quantity")
     @classmethod
     def validate_quantity(cls, v: int) -> int:
-        if v <= 0:
-            raise ValueError("quantity 必须大于 0")
-        if v % 100 != 0:
-            raise ValueError("quantity 必须为 100 的整数倍")
+        if v <= 0 or v % 100:
+            raise ValueError("quantity 必须大于 0" if v <= 0 else "quantity 必须为 100 的整数倍")
         return v
 
 
@@ -89,18 +100,7 @@ def normalize_stock_code(symbol: str) -> str:
         # 已带后缀，直接返回
         return symbol.upper()
 
-    code = symbol.strip()
-    if len(code) != 6 or not code.isdigit():
-        raise ValueError(f"股票代码必须是6位数字，收到: {symbol}")
-
-    if code.startswith(("00", "30", "15", "16", "18", "12")):
-        return f"{code}.SZ"
-    elif code.startswith(("60", "68", "11")):
-        return f"{code}.SH"
-    elif code.startswith(("83", "43")):
-        return f"{code}.BJ"
-
-    raise ValueError(f"无法识别股票代码前缀: {code}")
+    return add_stock_suffix(symbol.strip())
 
 
 # ---------------------------------------------------------------------------
@@ -108,10 +108,16 @@ def normalize_stock_code(symbol: str) -> str:
 # ---------------------------------------------------------------------------
 
 class SignalDeduplicator:
-    """基于 signal_id 的去重器，线程安全，带 TTL 和容量上限。"""
+    """
+    基于 signal_id 的去重器，线程安全，带 TTL 和容量上限。
+
+    用 dict 记录 signal_id -> 过期时间，并用 deque 按插入顺序保存
+    (signal_id, 过期时间)，过期淘汰和超出容量时都只需从队首弹出。
+    """
 
     def __init__(self, ttl: int = 300, max_size: int = 1000):
-        self._cache: OrderedDict[str, float] = OrderedDict()
+        self._ids: Dict[str, float] = {}
+        self._queue: Deque[Tuple[str, float]] = deque()
         self._lock = threading.Lock()
         self._ttl = ttl
         self._max_size = max_size
@@ -121,21 +127,21 @@ class SignalDeduplicator:
         now = time.time()
         with self._lock:
             self._evict(now)
-            if signal_id in self._cache:
+            if signal_id in self._ids:
                 return True
-            self._cache[signal_id] = now
+            expiry = now + self._ttl
+            self._ids[signal_id] = expiry
+            self._queue.append((signal_id, expiry))
             # 容量上限
-            while len(self._cache) > self._max_size:
-                self._cache.popitem(last=False)
+            while len(self._ids) > self._max_size:
+                key, _ = self._queue.popleft()
+                del self._ids[key]
             return False
 
     def _evict(self, now: float) -> None:
-        while self._cache:
-            oldest_key, oldest_time = next(iter(self._cache.items()))
-            if now - oldest_time > self._ttl:
-                self._cache.popitem(last=False)
-            else:
-                break
+        while self._queue and self._queue[0][1] < now:
+            key, _ = self._queue.popleft()
+            del self._ids[key]
 
 
 # ---------------------------------------------------------------------------
@@ -146,13 +152,18 @@ class SignalService:
     """
     信号桥接服务
 
-    接收外部交易信号 (HTTP POST /signal)，通过 QMTClient 转发至 QMTServer 执行。
+    接收外部交易信号 (HTTP POST /signal)，通过 QMTClient 异步转发至 QMTServer 执行，
+    等待 QMT 响应期间不阻塞事件循环。并发到达的信号在 batch_window 时间窗口内
+    合并为一次 orders_batch 请求提交，再将结果分发回各自的请求。batch_size 为 1
+    或 QMTServer 不支持 orders_batch（返回404）时，逐单调用 order_stock。
 
     Attributes:
         qmt_client: QMTClient 实例
         host: 监听地址
         port: 监听端口
         token: 访问令牌
+        batch_size: 单批次最多合并的订单数，为 1 时不攒批，直接调用 order_stock
+        batch_window: 攒批等待时间（秒）
         app: FastAPI 应用
     """
 
@@ -163,18 +174,131 @@ class SignalService:
         host: str = "0.0.0.0",
         port: int = 9000,
         token: Optional[str] = None,
+        batch_size: int = 32,
+        batch_window: float = 0.005,
     ):
         self.qmt_client = QMTClient(base_url=qmt_base_url, token=qmt_token)
         self.host = host
         self.port = port
         self.token = token or secrets.token_hex(32)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
         self.dedup = SignalDeduplicator()
-        self.app = FastAPI(title="QKA Signal Bridge")
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_worker: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._batch_supported = batch_size > 1
+        self.app = FastAPI(title="QKA Signal Bridge", lifespan=self._lifespan)
 
         print(f"\n信号服务 Token: {self.token}\n")
 
         self._setup_routes()
 
+    # -- 生命周期 -----------------------------------------------------------
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        # 队列和攒批任务需绑定到 uvicorn 的事件循环，因此在启动时创建
+        self._queue = asyncio.Queue()
+        self._batch_worker = asyncio.create_task(self._run_batcher())
+        yield
+        self._batch_worker.cancel()
+        try:
+            await self._batch_worker
+        except asyncio.CancelledError:
+            pass
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        # 关闭时释放 QMTClient 的异步连接池
+        await self.qmt_client.aclose()
+
+    # -- 攒批转发 -----------------------------------------------------------
+
+    async def _submit_order(self, order: Dict[str, Any]) -> Any:
+        """将单个订单放入攒批队列，等待所在批次返回该订单的结果。"""
+        if not self._batch_supported:
+            return await self.qmt_client.api_async("order_stock", **order)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order, future))
+        return await future
+
+    async def _run_batcher(self):
+        """从队列中收集订单，凑满 batch_size 或等待 batch_window 后整批提交。"""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 批次之间并发提交，不等待上一批返回
+            task = asyncio.create_task(self._send_batch(items))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """以一次 orders_batch 请求提交整批订单，并按顺序回填每个订单的结果。"""
+        error: Exception = Exception("orders_batch 未返回该订单的结果")
+        try:
+            # 直接取原始响应，先判断404，避免 api_async 把接口不存在记为错误日志
+            response = await self.qmt_client.post_async(
+                "orders_batch",
+                orders=[order for order, _ in items],
+            )
+            if response.status_code == 404:
+                # 旧版 QMTServer 没有 orders_batch，之后的订单都直接调用 order_stock
+                logger.warning("QMTServer 不支持 orders_batch，改为逐单下单")
+                self._batch_supported = False
+                await asyncio.gather(*(
+                    self._send_single(order, future) for order, future in items
+                ))
+                return
+            results = self.qmt_client.parse_response(response)
+
+            if not isinstance(results, list) or len(results) != len(items):
+                error = Exception(f"orders_batch 返回结果格式错误: {results!r}")
+                return
+
+            for (_, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if not isinstance(result, dict):
+                    future.set_exception(Exception(f"orders_batch 返回结果格式错误: {result!r}"))
+                elif result.get('success'):
+                    future.set_result(result.get('data'))
+                else:
+                    future.set_exception(Exception(f"下单失败: {result.get('detail')}"))
+        except Exception as e:
+            error = e
+        finally:
+            # 无论成功与否，保证批次内的每个请求都能得到结果，不会一直挂起
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _send_single(self, order: Dict[str, Any], future: asyncio.Future):
+        """单独调用 order_stock 下单，并将结果回填到 future。"""
+        try:
+            result = await self.qmt_client.api_async("order_stock", **order)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
     # -- 认证 ---------------------------------------------------------------
 
     async def verify_token(self, x_token: str = Header(...)):
@@ -219,18 +343,18 @@ class SignalService:
 
             # 转发至 QMTServer
             try:
-                result = self.qmt_client.api(
-                    "order_stock",
-                    stock_code=stock_code,
-                    order_type=order_type,
-                    order_volume=req.quantity,
-                    price_type=req.price_type,
-                    price=req.price,
-                )
+                result = await self._submit_order({
+                    "stock_code": stock_code,
+                    "order_type": order_type,
+                    "order_volume": req.quantity,
+                    "price_type": req.price_type,
+                    "price": req.price,
+                })
                 order_id = str(result) if result is not None else None
+                # 使用 % 参数延迟格式化，日志级别不输出时不产生格式化开销
                 logger.info(
-                    f"信号已转发: {req.side} {stock_code} x{req.quantity} "
-                    f"signal_id={signal_id} order_id={order_id}"
+                    "信号已转发: %s %s x%d signal_id=%s order_id=%s",
+                    req.side, stock_code, req.quantity, signal_id, order_id,
                 )
                 return SignalResponse(
                     success=True,
@@ -239,7 +363,7 @@ class SignalService:
                     message="信号已提交",
                 )
             except Exception as e:
-                logger.error(f"信号转发失败: {signal_id} {e}")
+                logger.error("信号转发失败: %s %s", signal_id, e)
                 return SignalResponse(
                     success=False,
                     signal_id=signal_id,
@@ -249,7 +373,13 @@ class SignalService:
     # -- 启动 ---------------------------------------------------------------
 
     def start(self):
-        """启动信号桥接服务"""
+        """
+        启动信号桥接服务
+
+        项目依赖中声明了 uvloop（Windows 除外）和 httptools，已安装时 uvicorn 会自动选用
+        uvloop 事件循环和 httptools 解析器。
+        服务以单进程运行：去重缓存和攒批队列都在进程内，多 worker 会导致跨进程无法去重。
+        """
         uvicorn.run(self.app, host=self.host, port=self.port)
 
 
@@ -263,6 +393,8 @@ def signal_service(
     host: str = "0.0.0.0",
     port: int = 9000,
     token: Optional[str] = None,
+    batch_size: int = 32,
+    batch_window: float = 0.005,
 ):
     """
     快速创建并启动信号桥接服务的便捷函数
@@ -273,6 +405,8 @@ def signal_service(
         host: 监听地址，默认 0.0.0.0
         port: 监听端口，默认 9000
         token: 信号服务访问令牌，不提供则自动生成
+        batch_size: 单批次最多合并的订单数，默认 32，为 1 时不攒批
+        batch_window: 攒批等待时间（秒），默认 0.005
     """
     svc = SignalService(
         qmt_base_url=qmt_base_url,
@@ -280,5 +414,7 @@ def signal_service(
         host=host,
         port=port,
         token=token,
+        batch_size=batch_size,
+        batch_window=batch_window,
     )
     svc.start()
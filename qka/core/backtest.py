@@ -4,7 +4,9 @@ QKA回测引擎模块
 提供基于时间序列的回测功能，支持多股票横截面数据处理，包含完整的交易记录和可视化功能。
 """
 
+import pandas as pd
 import plotly.graph_objects as go
+from qka.core.strategy import Strategy
 from qka.utils.logger import logger
 
 class Backtest:
@@ -24,7 +26,7 @@ class Backtest:
         
         Args:
             data (Data): Data类的实例，包含股票数据
-            strategy (Strategy): 策略对象，必须包含on_bar方法
+            strategy (Strategy): 策略对象，必须实现on_bar方法（向量化策略为on_bars方法）
         """
         self.data = data
         self.strategy = strategy
@@ -35,22 +37,51 @@ class Backtest:
         
         遍历所有时间点，在每个时间点调用策略的on_bar方法进行交易决策，
         并记录交易后的状态。
+
+        如果策略声明了 vectorized = True，则不再逐bar回调，而是将全部因子矩阵
+        一次性交给策略的on_bars方法处理，策略在每个bar交易完成后
+        调用传入的record(i)记录该bar的状态。
+
+        Raises:
+            TypeError: 策略没有实现所需的on_bar或on_bars方法时抛出
         """
-        # 获取所有股票数据（dask DataFrame -> pandas DataFrame）
-        df = self.data.get().compute()
+        vectorized = getattr(self.strategy, 'vectorized', False)
+        method = 'on_bars' if vectorized else 'on_bar'
+        if getattr(type(self.strategy), method, None) in (None, getattr(Strategy, method)):
+            raise TypeError(
+                f"策略 {type(self.strategy).__name__} 没有实现 {method} 方法"
+                + ("（声明了 vectorized = True）" if vectorized else "")
+            )
+
+        # 获取所有股票数据（直接在pandas中合并，不经过dask）
+        df = self.data.to_pandas()
 
         # 预计算每个因子对应的列名映射，避免每次get()都做字符串扫描
+        # 一次性向量化拆分 {symbol}_{factor} 列名，不含'_'的列没有因子部分，直接忽略
         factor_columns = {}
-        for col in df.columns:
-            parts = col.rsplit('_', 1)
-            if len(parts) == 2:
-                symbol, factor_name = parts
-                if factor_name not in factor_columns:
-                    factor_columns[factor_name] = {}
-                factor_columns[factor_name][col] = symbol
+        parts = df.columns.str.rsplit('_', n=1, expand=True)
+        if parts.nlevels == 2:
+            symbols = pd.Series(parts.get_level_values(0), index=df.columns)
+            factors = parts.get_level_values(1)
+            for factor_name, mapping in symbols.groupby(factors, sort=False):
+                factor_columns[factor_name] = mapping.to_dict()
+
+        # 按因子预先切分为二维数组（行: 日期，列: 股票），循环内按行号取数据，
+        # 避免逐行构造Series后再按列名索引
+        mats = {}
+        syms = {}
+        for factor_name, mapping in factor_columns.items():
+            cols = list(mapping.keys())
+            mat = df[cols].to_numpy()
+            # 矩阵会原样交给向量化策略的on_bars，设为只读，防止策略原地修改污染回测数据
+            mat.flags.writeable = False
+            mats[factor_name] = mat
+            syms[factor_name] = pd.Index([mapping[c] for c in cols])
 
-        for date, row in df.iterrows():
-            def get(factor, _fc=factor_columns):
+        dates = df.index
+
+        def make_get(i, date):
+            def get(factor):
                 """
                 获取指定因子的数据
 
@@ -60,10 +91,23 @@ class Backtest:
                 Returns:
                     pd.Series: 该因子在所有股票上的值
                 """
-                mapping = _fc.get(factor, {})
-                s = row[list(mapping.keys())]
-                s.index = [mapping[c] for c in s.index]
-                return s
+                if factor not in mats:
+                    return pd.Series(dtype=float, name=date)
+                # 每次调用都复制该行，策略对结果的原地修改不会影响broker和后续bar
+                return pd.Series(mats[factor][i], index=syms[factor], name=date, copy=True)
+            return get
+
+        # 向量化策略：一次性传入整个因子矩阵，跳过逐bar的Python循环
+        if vectorized:
+            def record(i):
+                """记录第i个bar的broker状态，应在该bar的交易完成后按顺序调用"""
+                self.strategy.broker.on_bar(dates[i], make_get(i, dates[i]))
+
+            self.strategy.on_bars(mats, syms, dates, record)
+            return
+
+        for i, date in enumerate(dates):
+            get = make_get(i, date)
             
             # 先调用策略的on_bar（可能包含交易操作）
             self.strategy.on_bar(date, get)
@@ -96,7 +140,8 @@ class Backtest:
         # 创建交互式图表
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
+        # 使用WebGL渲染，长周期回测的大量数据点也能流畅缩放和拖动
+        fig.add_trace(go.Scattergl(
             x=total_assets.index,
             y=total_assets.values,
             mode='lines',
@@ -109,8 +109,34 @@ class Data():
         Returns:
             dd.DataFrame: 合并后的股票数据，每只股票的列名格式为 {symbol}_{column}
         """
-        # 准备缓存目录
+        dfs = [dd.from_pandas(df, npartitions=1) for df in self._load()]
 
+        df = dd.concat(dfs, axis=1, join='outer')
+
+        return df
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        获取历史数据（pandas DataFrame）
+
+        与 get() 返回相同的数据，但直接在pandas中合并，不构建Dask任务图，
+        适合数据可以完整放入内存的场景（如回测）。
+
+        Returns:
+            pd.DataFrame: 合并后的股票数据，每只股票的列名格式为 {symbol}_{column}
+        """
+        return pd.concat(self._load(), axis=1, join='outer', sort=True)
+
+    def _load(self) -> List[pd.DataFrame]:
+        """
+        下载并读取所有股票数据，应用因子计算
+
+        Returns:
+            List[pd.DataFrame]: 每只股票一个DataFrame，列名已重命名为 {symbol}_{column}
+
+        Raises:
+            ValueError: 没有任何可用的股票数据时抛出
+        """
         with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
             # 提交下载任务
             futures = {
@@ -135,18 +161,14 @@ class Data():
             if not parquet_path.exists():
                 logger.warning(f"数据文件不存在，跳过: {symbol}")
                 continue
-            df = dd.read_parquet(str(parquet_path))
-            df = self.factor(df.compute())  # 转为pandas后应用因子
-            df = dd.from_pandas(df, npartitions=1)
+            df = self.factor(pd.read_parquet(parquet_path))
             column_mapping = {col: f'{symbol}_{col}' for col in df.columns}
             dfs.append(df.rename(columns=column_mapping))
 
         if not dfs:
             raise ValueError("没有可用的股票数据，请检查symbols列表和数据缓存")
 
-        df = dd.concat(dfs, axis=1, join='outer')
-
-        return df
+        return dfs
 
     def _get_from_akshare(self, symbol: str) -> pd.DataFrame:
         """
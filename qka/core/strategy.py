@@ -4,7 +4,7 @@ QKA策略模块
 提供策略开发的抽象基类，定义策略开发的标准接口和事件处理机制。
 """
 
-from abc import ABC, abstractmethod
+from abc import ABC
 from typing import Optional
 from qka.core.broker import Broker
 
@@ -12,12 +12,17 @@ class Strategy(ABC):
     """
     策略抽象基类
 
-    所有自定义策略都应该继承此类，并实现on_bar方法。
+    所有自定义策略都应该继承此类，并实现on_bar方法；声明 vectorized = True 的
+    向量化策略改为实现on_bars方法，无需实现on_bar。回测引擎在运行前检查
+    对应方法是否已实现，未实现时抛出TypeError。
 
     Attributes:
         broker (Broker): 交易经纪商实例，用于执行交易操作
+        vectorized (bool): 是否为向量化策略，为True时回测引擎调用on_bars而非逐bar调用on_bar
     """
 
+    vectorized = False
+
     def __init__(self, broker: Optional[Broker] = None):
         """
         初始化策略
@@ -27,13 +32,29 @@ class Strategy(ABC):
         """
         self.broker = broker or Broker()
     
-    @abstractmethod
     def on_bar(self, date, get):
         """
-        每个bar的处理逻辑，必须由子类实现
+        每个bar的处理逻辑，非向量化策略必须由子类实现
         
         Args:
             date: 当前时间戳
             get: 获取因子数据的函数，格式为 get(factor_name) -> pd.Series
         """
+        pass
+
+    def on_bars(self, mats, symbols, dates, record):
+        """
+        向量化策略的处理逻辑，vectorized = True 时由回测引擎调用一次
+
+        适合可以在整个日期×股票矩阵上一次性计算信号的策略，可配合NumPy/Numba
+        处理连续的数组。该模式下回测引擎不会逐bar调用on_bar，策略按日期顺序
+        通过self.broker下单，并在每个bar的交易完成后调用record(i)，由回测引擎
+        记录该bar的broker状态（即逐bar模式下broker.on_bar所做的事）。
+
+        Args:
+            mats: 因子矩阵字典，格式为 {factor_name: np.ndarray}，形状为 [日期数, 股票数]
+            symbols: 每个因子矩阵的列对应的股票代码，格式为 {factor_name: pd.Index}
+            dates: 矩阵行对应的时间索引
+            record: 记录状态的函数，格式为 record(i)，i为dates中的行号
+        """
         pass
\ No newline at end of file
@@ -1,8 +1,13 @@
 from typing import Dict, Any, Optional, Callable
 import asyncio
+import functools
+import os
+import threading
 from mcp.server import FastMCP
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datetime import datetime
 
 class ModelServer:
@@ -57,10 +62,54 @@ class ModelServer:
         print("模型服务器已停止")
 
 
+def _write_csv(df: pd.DataFrame, file_path: Path):
+    """
+    使用 Arrow 的 C++ CSV 写入器保存 DataFrame（带 UTF-8 BOM，便于 Excel 打开）
+
+    Arrow 写出的格式与 pandas 略有不同（字符串字段加引号、时间带微秒、
+    布尔值为 true/false、整数值的浮点数不带 .0）。含 timedelta 列（Arrow 会
+    写成整数）或 Arrow 无法转换、写出的 DataFrame（如混合类型或 list 列）
+    回退到 pandas 的写入器。
+    """
+    if any(dtype.kind == 'm' for dtype in df.dtypes):
+        df.to_csv(file_path, index=False, encoding='utf-8-sig')
+        return
+
+    # 流式写入同目录下的临时文件，成功后再替换为目标文件，失败时不会留下不完整的CSV
+    tmp_path = file_path.with_name(f".{file_path.name}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b'\xef\xbb\xbf')
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f)
+        os.replace(tmp_path, file_path)
+    except pa.ArrowException:
+        df.to_csv(file_path, index=False, encoding='utf-8-sig')
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+# query_akshare_data 执行用户代码时允许使用的内置函数
+_ALLOWED_BUILTINS = {
+    "range": range, "len": len, "list": list, "dict": dict,
+    "str": str, "int": int, "float": float, "bool": bool,
+    "print": print, "sorted": sorted, "enumerate": enumerate,
+    "zip": zip, "map": map, "filter": filter, "sum": sum,
+    "min": min, "max": max, "abs": abs, "round": round,
+    "isinstance": isinstance, "type": type, "tuple": tuple, "set": set,
+    "True": True, "False": False, "None": None,
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_query(code: str):
+    """编译查询代码并缓存，相同代码重复查询时跳过解析和编译"""
+    return compile(code, '<query>', 'exec')
+
+
 app = FastMCP('qka')
 
 @app.tool()
-def query_akshare_data(
+async def query_akshare_data(
         code: str = ''
 ) -> dict:
     """
@@ -68,21 +117,20 @@ def query_akshare_data(
     :param code: 查询代码，要求使用akshare库, 要求生成的函数名叫query,返回数据格式为pandas.DataFrame
     :return: 查询结果
     """
+    # 执行代码、网络请求和写文件都是阻塞操作，放到线程中执行，避免阻塞事件循环
+    return await asyncio.to_thread(_run_query, code)
+
+
+def _run_query(code: str) -> dict:
+    """在当前线程中执行查询代码并保存结果，供 query_akshare_data 调用"""
     try:
         import akshare as ak
     except ImportError:
         return {"error": "无法导入akshare模块，请确认已正确安装"}
 
     # 限制exec命名空间，只暴露数据分析相关模块
-    allowed_globals = {"__builtins__": {
-        "range": range, "len": len, "list": list, "dict": dict,
-        "str": str, "int": int, "float": float, "bool": bool,
-        "print": print, "sorted": sorted, "enumerate": enumerate,
-        "zip": zip, "map": map, "filter": filter, "sum": sum,
-        "min": min, "max": max, "abs": abs, "round": round,
-        "isinstance": isinstance, "type": type, "tuple": tuple, "set": set,
-        "True": True, "False": False, "None": None,
-    }}
+    # 每次复制一份内置函数表，避免用户代码修改后影响后续调用
+    allowed_globals = {"__builtins__": dict(_ALLOWED_BUILTINS)}
     allowed_globals['akshare'] = ak
     allowed_globals['ak'] = ak
     allowed_globals['pd'] = pd
@@ -90,7 +138,7 @@ def query_akshare_data(
     local_namespace = {}
 
     try:
-        exec(code, allowed_globals, local_namespace)
+        exec(_compile_query(code), allowed_globals, local_namespace)
 
         # 检查是否定义了query函数
         if 'query' not in local_namespace or not callable(local_namespace['query']):
@@ -113,16 +161,14 @@ def query_akshare_data(
         file_path = save_dir / filename
 
         # 保存为CSV文件
-        result.to_csv(file_path, index=False, encoding='utf-8-sig')
-
-        # 将DataFrame转换为字典返回，并包含条数信息和文件路径
-        data_dict = result.to_dict(orient="records")
+        _write_csv(result, file_path)
 
+        # 返回条数信息、文件路径和前10条预览，只转换预览部分，避免为整表构造字典
         return {
             "message": "数据已成功保存为CSV文件",
             "file_path": str(file_path),
-            "record_count": len(data_dict),
-            "data": data_dict[:10] if len(data_dict) > 10 else data_dict  # 只返回前10条预览
+            "record_count": len(result),
+            "data": result.head(10).to_dict(orient="records")
         }
 
     except Exception as e:
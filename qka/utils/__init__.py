@@ -5,10 +5,10 @@ QKA Utils 模块
 
 from .logger import logger, create_logger, get_structured_logger
 from .anis import RED, GREEN, YELLOW, BLUE, RESET
-from .util import timestamp_to_datetime_string, parse_order_type, convert_to_current_date
+from .util import timestamp_to_datetime_string, timestamps_to_datetime_strings, parse_order_type, convert_to_current_date
 
 __all__ = [
     'logger', 'create_logger', 'get_structured_logger',
     'RED', 'GREEN', 'YELLOW', 'BLUE', 'RESET',
-    'timestamp_to_datetime_string', 'parse_order_type', 'convert_to_current_date'
+    'timestamp_to_datetime_string', 'timestamps_to_datetime_strings', 'parse_order_type', 'convert_to_current_date'
 ]
@@ -1,24 +1,36 @@
+import re
 from xtquant import xtconstant
 from datetime import datetime
 from qka.utils.anis import RED, GREEN, YELLOW, BLUE, RESET
 
+# 6位数字股票代码
+_CODE_RE = re.compile(r'[0-9]{6}')
+
+# 代码前两位 -> 交易所后缀
+_PREFIX2EX = {p: ".SZ" for p in ("00", "30", "15", "16", "18", "12")}  # 深圳证券交易所
+_PREFIX2EX.update({p: ".SH" for p in ("60", "68", "11")})            # 上海证券交易所
+_PREFIX2EX.update({p: ".BJ" for p in ("83", "43")})                  # 北京证券交易所
+
+# 超过该值的时间戳视为毫秒级（整数比较，避免与浮点数 1e12 比较时的类型提升）
+_MS_THRESHOLD = 1_000_000_000_000
+
+# 买卖方向的彩色文字，日志中频繁使用，预先拼接好
+_BUY_STR = f"{RED}买入{RESET}"
+_SELL_STR = f"{GREEN}卖出{RESET}"
+
 def add_stock_suffix(stock_code):
     """
     为给定的股票代码添加相应的后缀。
     """
     # 检查股票代码是否为6位数字
-    if len(stock_code) != 6 or not stock_code.isdigit():
-        raise ValueError("股票代码必须是6位数字")
+    if not _CODE_RE.fullmatch(stock_code):
+        raise ValueError(f"股票代码必须是6位数字，收到: {stock_code}")
 
     # 根据股票代码的前缀添加相应的后缀
-    if stock_code.startswith("00") or stock_code.startswith("30") or stock_code.startswith("15") or stock_code.startswith("16") or stock_code.startswith("18") or stock_code.startswith("12"):
-        return f"{stock_code}.SZ"  # 深圳证券交易所
-    elif stock_code.startswith("60") or stock_code.startswith("68") or stock_code.startswith("11"):
-        return f"{stock_code}.SH"  # 上海证券交易所
-    elif stock_code.startswith("83") or stock_code.startswith("43"):
-        return f"{stock_code}.BJ"  # 北京证券交易所
-
-    raise ValueError(f"无法识别股票代码前缀: {stock_code}")
+    suffix = _PREFIX2EX.get(stock_code[:2])
+    if suffix is None:
+        raise ValueError(f"无法识别股票代码前缀: {stock_code}")
+    return stock_code + suffix
 
 def timestamp_to_datetime_string(timestamp):
     """
@@ -31,11 +43,26 @@ def timestamp_to_datetime_string(timestamp):
     time_string = dt_object.strftime('%Y-%m-%d %H:%M:%S')
     return time_string
 
+def timestamps_to_datetime_strings(timestamps):
+    """
+    批量将时间戳转换为时间字符串，与 timestamp_to_datetime_string 结果一致（本地时区）。
+
+    :param timestamps: 时间戳数组（秒级）
+    :return: 格式化的时间字符串数组 'YYYY-MM-DD HH:MM:SS'
+    """
+    # 延迟导入：本模块也被实盘交易回调路径导入，不为这个批量函数提前加载 pandas
+    import numpy as np
+    import pandas as pd
+    from dateutil.tz import tzlocal
+
+    dt_index = pd.to_datetime(np.asarray(timestamps), unit='s', utc=True).tz_convert(tzlocal())
+    return dt_index.strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+
 def parse_order_type(order_type):
     if order_type == xtconstant.STOCK_BUY:
-        return f"{RED}买入{RESET}"
+        return _BUY_STR
     elif order_type == xtconstant.STOCK_SELL:
-        return f"{GREEN}卖出{RESET}"
+        return _SELL_STR
     return f"未知({order_type})"
 
 def convert_to_current_date(timestamp):
@@ -46,6 +73,4 @@ def convert_to_current_date(timestamp):
     :return: 秒级时间戳
     """
     # 处理毫秒级时间戳
-    if timestamp > 1e12:
-        timestamp = timestamp / 1000
-    return timestamp
\ No newline at end of file
+    return timestamp / 1000 if timestamp > _MS_THRESHOLD else timestamp
\ No newline at end of file
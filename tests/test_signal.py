@@ -0,0 +1,168 @@
+"""SignalService 攒批转发与信号去重测试"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from qka.brokers.signal import SignalDeduplicator, SignalService
+
+TOKEN = "signal_token"
+
+
+def mock_qmt(svc, handler):
+    """让 SignalService 的 QMTClient 使用 MockTransport 模拟 QMTServer"""
+    svc.qmt_client.async_session = httpx.AsyncClient(
+        base_url=svc.qmt_client.base_url,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def make_service(handler, **kwargs):
+    """创建使用 MockTransport 模拟 QMTServer 的 SignalService"""
+    svc = SignalService(qmt_token="qmt_token", token=TOKEN, **kwargs)
+    mock_qmt(svc, handler)
+    return svc
+
+
+def post_signals(svc, quantities):
+    """并发发送多个信号，返回按输入顺序排列的响应 JSON"""
+    with TestClient(svc.app) as client:
+        def post(quantity):
+            return client.post(
+                "/signal",
+                json={"symbol": "600000", "side": "buy", "quantity": quantity},
+                headers={"X-Token": TOKEN},
+            ).json()
+
+        with ThreadPoolExecutor(len(quantities)) as executor:
+            return list(executor.map(post, quantities))
+
+
+def test_concurrent_signals_are_batched():
+    calls = []
+
+    def handler(request):
+        orders = json.loads(request.content)["orders"]
+        calls.append((request.url.path, len(orders)))
+        data = [{"success": True, "data": order["order_volume"]} for order in orders]
+        return httpx.Response(200, json={"success": True, "data": data})
+
+    quantities = [100 * (i + 1) for i in range(8)]
+    # 时间窗口足够长，批次只会在凑满 batch_size 时提交，结果与线程调度无关
+    svc = make_service(handler, batch_size=len(quantities), batch_window=30)
+    responses = post_signals(svc, quantities)
+
+    assert all(r["success"] for r in responses)
+    # 每个请求拿到的是自己那笔订单的结果
+    assert [r["order_id"] for r in responses] == [str(q) for q in quantities]
+    assert calls == [("/api/orders_batch", len(quantities))]
+
+
+def test_failed_order_only_fails_its_own_request():
+    def handler(request):
+        orders = json.loads(request.content)["orders"]
+        data = [
+            {"success": False, "detail": "资金不足"} if order["order_volume"] == 200
+            else {"success": True, "data": 1}
+            for order in orders
+        ]
+        return httpx.Response(200, json={"success": True, "data": data})
+
+    svc = make_service(handler, batch_window=0.2)
+    responses = post_signals(svc, [100, 200, 300])
+
+    assert [r["success"] for r in responses] == [True, False, True]
+    assert "资金不足" in responses[1]["message"]
+
+
+def test_batch_request_error_fails_every_request():
+    def handler(request):
+        return httpx.Response(500, json={"detail": "boom"})
+
+    svc = make_service(handler, batch_window=0.2)
+    responses = post_signals(svc, [100, 200])
+
+    assert not any(r["success"] for r in responses)
+
+
+@pytest.mark.parametrize("make_reply, expected", [
+    (lambda orders: [], [False, False]),
+    (lambda orders: None, [False, False]),
+    (lambda orders: [{"success": True, "data": 1}] * (len(orders) + 1), [False, False]),
+    (
+        lambda orders: [
+            {"success": True, "data": 1} if order["order_volume"] == 100 else "bad"
+            for order in orders
+        ],
+        [True, False],
+    ),
+], ids=["empty", "null", "too-long", "non-dict-item"])
+def test_malformed_batch_reply_does_not_hang(make_reply, expected):
+    def handler(request):
+        orders = json.loads(request.content)["orders"]
+        return httpx.Response(200, json={"success": True, "data": make_reply(orders)})
+
+    # 两个信号必定在同一批次中提交
+    svc = make_service(handler, batch_size=2, batch_window=30)
+    responses = post_signals(svc, [100, 200])
+
+    assert [r["success"] for r in responses] == expected
+
+
+def test_falls_back_to_order_stock_without_batch_endpoint(caplog):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path == "/api/orders_batch":
+            return httpx.Response(404, json={"detail": "Not Found"})
+        order = json.loads(request.content)
+        return httpx.Response(200, json={"success": True, "data": order["order_volume"]})
+
+    svc = make_service(handler)
+    responses = post_signals(svc, [100, 200])
+    assert [r["order_id"] for r in responses] == ["100", "200"]
+    assert "/api/order_stock" in paths
+    # 404 属于预期内的回退，不应记录为错误
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+    # 确认不支持后，后续信号不再尝试 orders_batch（服务关闭时会释放连接池，需重新挂载）
+    paths.clear()
+    mock_qmt(svc, handler)
+    post_signals(svc, [300])
+    assert paths == ["/api/order_stock"]
+
+
+def test_batch_size_one_calls_order_stock_directly():
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"success": True, "data": 1})
+
+    svc = make_service(handler, batch_size=1)
+    responses = post_signals(svc, [100, 200])
+
+    assert all(r["success"] for r in responses)
+    assert paths == ["/api/order_stock", "/api/order_stock"]
+
+
+def test_deduplicator_remembers_max_size_ids():
+    dedup = SignalDeduplicator(max_size=8)
+    ids = [f"signal-{i}" for i in range(8)]
+
+    assert not any(dedup.is_duplicate(i) for i in ids)
+    assert all(dedup.is_duplicate(i) for i in ids)
+
+
+def test_deduplicator_forgets_oldest_id_over_capacity():
+    dedup = SignalDeduplicator(max_size=3)
+    for i in range(4):
+        dedup.is_duplicate(f"signal-{i}")
+
+    assert dedup.is_duplicate("signal-3")
+    assert not dedup.is_duplicate("signal-0")